@@ -13,6 +13,13 @@ class PostAdmin(admin.ModelAdmin):
     list_editable = (
         'is_published',
     )
+    list_select_related = (
+        'author',
+        'category',
+        'location',
+    )
+    list_per_page = 50
+    show_full_result_count = False
 
 
 class CategoryAdmin(admin.ModelAdmin):
@@ -0,0 +1,10 @@
+from django.utils import timezone
+
+
+class RequestTimeMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.now = timezone.now()
+        return self.get_response(request)
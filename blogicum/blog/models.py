@@ -78,10 +78,19 @@ class Post(BaseModel):
 
     image = models.ImageField(verbose_name='Фото', upload_to='posts_images',
                               blank=True)
+    comment_count = models.PositiveIntegerField(default=0,
+                                                editable=False,
+                                                verbose_name='Комментарии')
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
+        ordering = ['-pub_date', '-id']
+        indexes = [
+            models.Index(fields=['-pub_date', '-id'],
+                         name='post_feed_idx',
+                         condition=models.Q(is_published=True)),
+        ]
 
     def __str__(self):
         return self.title
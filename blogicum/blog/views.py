@@ -1,11 +1,15 @@
-from datetime import datetime
+from urllib.parse import urlencode
 
-from django.db.models import Count
+from django.db.models import (
+    BigAutoField, BooleanField, ExpressionWrapper, Prefetch, Q
+)
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import PermissionDenied
 from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.views.generic import (
     CreateView, DeleteView, DetailView, ListView, UpdateView
 )
@@ -14,39 +18,116 @@ from .models import Category, Post, User, Comment
 from .forms import CommentCreateForm, PostCreateForm
 
 POSTS_ON_PAGE_COUNT = 10
+POST_LIST_FIELDS = (
+    'id', 'title', 'text', 'pub_date', 'image', 'is_published',
+    'comment_count', 'author__username', 'category__title',
+    'category__slug', 'category__is_published', 'location__name',
+    'location__is_published',
+)
+
+
+def get_request_now(request):
+    return getattr(request, 'now', None) or timezone.now()
+
+
+def get_post_filter(now=None):
+    # Served by the partial index Post.post_feed_idx.
+    return Post.objects.select_related(
+        'author', 'category', 'location'
+    ).filter(is_published=True,
+             category__is_published=True,
+             pub_date__lte=now or timezone.now())
+
+
+class PostPage:
+    def __init__(self, object_list, has_next, has_previous):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
 
+    def __iter__(self):
+        return iter(self.object_list)
 
-def get_post_filter():
-    return Post.objects.all().filter(is_published=True,
-                                     category__is_published=True,
-                                     pub_date__lte=datetime.now())
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        last = self.object_list[-1]
+        return last.pub_date.isoformat(), last.id
+
+    @property
+    def next_page_query(self):
+        after_pub, after_id = self.next_cursor
+        return urlencode({'after_pub': after_pub, 'after_id': after_id})
 
 
 class PostPaginateMixin:
     model = Post
     paginate_by = POSTS_ON_PAGE_COUNT
 
+    def get_cursor(self):
+        after_id = self.request.GET.get('after_id', '')
+        if not (after_id.isascii() and after_id.isdigit()
+                and int(after_id) <= BigAutoField.MAX_BIGINT):
+            return None
+        try:
+            after_pub = parse_datetime(self.request.GET.get('after_pub', ''))
+            if after_pub is None:
+                return None
+            if timezone.is_naive(after_pub):
+                after_pub = timezone.make_aware(after_pub)
+            after_pub = after_pub.astimezone(timezone.utc)
+        except (ValueError, OverflowError):
+            return None
+        return after_pub, int(after_id)
+
+    def paginate_queryset(self, queryset, page_size):
+        cursor = self.get_cursor()
+        if cursor is not None:
+            after_pub, after_id = cursor
+            queryset = queryset.filter(
+                Q(pub_date__lt=after_pub)
+                | Q(pub_date=after_pub, id__lt=after_id))
+        posts = list(queryset.order_by('-pub_date', '-id')[:page_size + 1])
+        page = PostPage(posts[:page_size],
+                        has_next=len(posts) > page_size,
+                        has_previous=cursor is not None)
+        return None, page, page.object_list, page.has_other_pages()
+
 
 class ProfileListView(PostPaginateMixin, ListView):
     template_name = 'blog/profile.html'
 
+    def dispatch(self, request, *args, **kwargs):
+        self.profile_user = get_object_or_404(User,
+                                              username=kwargs['username'])
+        return super().dispatch(request, *args, **kwargs)
+
     def get_queryset(self):
-        if str(self.request.user) == self.kwargs.get('username'):
-            return Post.objects.filter(author__username=self.kwargs.get(
-                'username')).annotate(comment_count=Count('comments')
-                                      ).order_by('-pub_date')
+        if self.request.user.id == self.profile_user.id:
+            return Post.objects.select_related(
+                'author', 'category', 'location'
+            ).filter(author_id=self.profile_user.id).only(*POST_LIST_FIELDS)
         else:
-            return get_post_filter().filter(
-                author__username=self.kwargs.get(
-                    'username')).annotate(comment_count=Count('comments')
-                                          ).order_by('-pub_date')
+            return get_post_filter(get_request_now(self.request)).filter(
+                author_id=self.profile_user.id).only(*POST_LIST_FIELDS)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['profile'] = get_object_or_404(User.objects.filter(
-            username=self.kwargs.get('username')))
-        context['comment_count'] = Comment.objects.annotate(
-            comment_count=Count('post_id'))
+        context['profile'] = self.profile_user
         return context
 
 
@@ -79,15 +160,15 @@ class PostUpdateView(PostActionMixin, LoginRequiredMixin, UpdateView):
     fields = ('title', 'text', 'location', 'category', 'image')
 
     def dispatch(self, request, *args, **kwargs):
-        instance = get_object_or_404(Post, pk=kwargs['pk'])
+        self._post = get_object_or_404(Post.objects.select_related(
+            'author', 'category', 'location'), pk=kwargs['pk'])
         if (not request.user.is_authenticated
-                or instance.author != self.request.user):
+                or self._post.author_id != request.user.id):
             return redirect('blog:post_detail', kwargs['pk'])
         return super().dispatch(request, *args, **kwargs)
 
     def get_object(self, queryset=None):
-        posts = get_object_or_404(Post, pk=self.kwargs.get('pk'))
-        return posts
+        return self._post
 
     def get_success_url(self):
         return reverse('blog:post_detail',
@@ -98,62 +179,75 @@ class PostDeleteView(PostActionMixin, LoginRequiredMixin, DeleteView):
     fields = ('title', 'text', 'location', 'category', )
 
     def dispatch(self, request, *args, **kwargs):
-        instance = get_object_or_404(Post, pk=kwargs['pk'])
-        if instance.author != self.request.user:
+        self._post = get_object_or_404(Post.objects.select_related(
+            'author', 'category', 'location'), pk=kwargs['pk'])
+        if self._post.author_id != request.user.id:
             raise PermissionDenied
         return super().dispatch(request, *args, **kwargs)
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['form'] = PostCreateForm(self.request.POST or None,
-                                         instance=self.object)
-        return context
+    def get_object(self, queryset=None):
+        return self._post
 
 
 class PostListView(PostPaginateMixin, ListView):
     template_name = 'blog/index.html'
 
     def get_queryset(self):
-        posts = get_post_filter().annotate(comment_count=Count('comments')
-                                           ).order_by('-pub_date')
-        return posts
+        return get_post_filter(get_request_now(self.request)).only(
+            *POST_LIST_FIELDS)
 
 
 class PostDetailView(DetailView):
     model = Post
     template_name = 'blog/detail.html'
 
+    def get_queryset(self):
+        return Post.objects.select_related(
+            'author', 'category', 'location'
+        ).prefetch_related(Prefetch(
+            'comments',
+            queryset=Comment.objects.select_related('author').order_by(
+                'created_at'))
+        ).annotate(is_visible=ExpressionWrapper(
+            Q(is_published=True)
+            & Q(category__is_published=True)
+            & Q(pub_date__lte=get_request_now(self.request)),
+            output_field=BooleanField()))
+
     def dispatch(self, request, *args, **kwargs):
-        instance = get_object_or_404(Post, pk=kwargs['pk'])
-        if instance.author == request.user:
-            return super().dispatch(request, *args, **kwargs)
-        else:
-            instance = get_post_filter().filter(pk=kwargs['pk'])
-            if not instance:
-                raise Http404
+        instance = get_object_or_404(self.get_queryset(), pk=kwargs['pk'])
+        if instance.author_id != request.user.id and not instance.is_visible:
+            raise Http404
+        self._post = instance
         return super().dispatch(request, *args, **kwargs)
 
+    def get_object(self, queryset=None):
+        return self._post
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentCreateForm()
-        context['comments'] = self.object.comments.select_related('author')
+        context['comments'] = self.object.comments.all()
         return context
 
 
 class CategoryListView(PostPaginateMixin, ListView):
     template_name = 'blog/category.html'
 
+    def dispatch(self, request, *args, **kwargs):
+        self.category = get_object_or_404(Category,
+                                          slug=kwargs['slug'],
+                                          is_published=True)
+        return super().dispatch(request, *args, **kwargs)
+
     def get_queryset(self):
-        page_obj = get_post_filter().filter(category__slug=self.kwargs.get(
-            'slug')).annotate(comment_count=Count('comments')).order_by(
-                '-pub_date')
+        page_obj = get_post_filter(get_request_now(self.request)).filter(
+            category_id=self.category.id).only(*POST_LIST_FIELDS)
         return page_obj
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['category'] = get_object_or_404(Category,
-                                                slug=self.kwargs.get('slug'),
-                                                is_published=True)
+        context['category'] = self.category
         return context
 
 
@@ -167,7 +261,9 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
 
     def form_valid(self, form):
         form.instance.author = self.request.user
-        form.instance.post = get_object_or_404(Post, pk=self.kwargs.get('pk'))
+        if not Post.objects.filter(pk=self.kwargs['pk']).exists():
+            raise Http404
+        form.instance.post_id = self.kwargs['pk']
         return super().form_valid(form)
 
 
@@ -108,6 +108,22 @@ def many_posts_with_published_locations(
     )
 
 
+@pytest.fixture
+def posts_with_shared_pub_date(mixer: Mixer, user, published_category):
+    n_posts, n_same_pub_date = 25, 15
+    now = timezone.now()
+    pub_dates = [now - timedelta(days=1)] * n_same_pub_date + [
+        now - timedelta(days=2 + i) for i in range(n_posts - n_same_pub_date)
+    ]
+    return mixer.cycle(n_posts).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=(pub_date for pub_date in pub_dates),
+    )
+
+
 @pytest.fixture
 def post_comment_context_form_item(
     user_client: Client, post_with_published_location
@@ -0,0 +1,96 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+from blog.models import Comment, Post
+
+BEFORE_COMMENT_COUNT = [("blog", "0001_squashed_0006_auto_20231228_1936")]
+AFTER_COMMENT_COUNT = [("blog", "0002_post_comment_count")]
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_create_and_delete(
+    user_client, post_with_published_location
+):
+    post = post_with_published_location
+    post.refresh_from_db()
+    assert post.comment_count == 0
+
+    response = user_client.post(
+        f"/posts/{post.id}/comment/", data={"text": "Комментарий"}
+    )
+    assert response.status_code == HTTPStatus.FOUND
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что счётчик комментариев публикации увеличивается"
+        " при добавлении комментария."
+    )
+
+    comment = Comment.objects.get(post=post)
+    response = user_client.post(
+        f"/posts/{post.id}/delete_comment/{comment.id}/"
+    )
+    assert response.status_code == HTTPStatus.FOUND
+    post.refresh_from_db()
+    assert post.comment_count == 0, (
+        "Убедитесь, что счётчик комментариев публикации уменьшается"
+        " при удалении комментария."
+    )
+
+
+@pytest.mark.django_db
+def test_comment_count_survives_loaddata(
+    mixer, tmp_path, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 2
+
+    dump = tmp_path / "blog.json"
+    call_command("dumpdata", "blog.post", "blog.comment", output=str(dump))
+    Post.objects.all().delete()
+    call_command("loaddata", str(dump), verbosity=0)
+
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что загрузка фикстур не изменяет сохранённый"
+        " счётчик комментариев публикации."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_comment_count_migration_backfills_existing_posts():
+    executor = MigrationExecutor(connection)
+    executor.migrate(BEFORE_COMMENT_COUNT)
+    apps = executor.loader.project_state(BEFORE_COMMENT_COUNT).apps
+    User = apps.get_model("auth", "User")
+    Post = apps.get_model("blog", "Post")
+    Comment = apps.get_model("blog", "Comment")
+
+    author = User.objects.create(username="author")
+    expected = {}
+    for n_comments in (0, 2, 4):
+        post = Post.objects.create(
+            title="Публикация",
+            text="Текст",
+            pub_date="2020-01-01T00:00:00Z",
+            author=author,
+        )
+        Comment.objects.bulk_create(
+            Comment(text="Комментарий", post=post, author=author)
+            for _ in range(n_comments)
+        )
+        expected[post.id] = n_comments
+
+    executor = MigrationExecutor(connection)
+    executor.migrate(AFTER_COMMENT_COUNT)
+    apps = executor.loader.project_state(AFTER_COMMENT_COUNT).apps
+    Post = apps.get_model("blog", "Post")
+    assert dict(Post.objects.values_list("id", "comment_count")) == expected
+
+    executor = MigrationExecutor(connection)
+    executor.migrate(executor.loader.graph.leaf_nodes())
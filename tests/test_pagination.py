@@ -0,0 +1,109 @@
+import warnings
+from datetime import datetime
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _walk_pages(client, url):
+    pages = []
+    response = client.get(url)
+    while True:
+        assert response.status_code == HTTPStatus.OK
+        page_obj = response.context["page_obj"]
+        pages.append(page_obj)
+        if not page_obj.has_next():
+            return pages
+        response = client.get(f"{url}?{page_obj.next_page_query}")
+
+
+@pytest.mark.parametrize("url_name", ["index", "category"])
+def test_cursor_pagination_walks_all_posts(
+    client, posts_with_shared_pub_date, published_category, url_name
+):
+    url = {
+        "index": "/",
+        "category": f"/category/{published_category.slug}/",
+    }[url_name]
+    pages = _walk_pages(client, url)
+
+    assert [len(page) for page in pages] == [N_PER_PAGE, N_PER_PAGE, 5]
+    assert not pages[0].has_previous()
+    assert all(page.has_previous() for page in pages[1:])
+    assert not pages[-1].has_next()
+
+    seen = [post.id for page in pages for post in page]
+    assert len(seen) == len(set(seen)), (
+        "Убедитесь, что при переходе по страницам публикации "
+        "не повторяются."
+    )
+    assert set(seen) == {post.id for post in posts_with_shared_pub_date}
+    ordering = [(post.pub_date, post.id) for page in pages for post in page]
+    assert ordering == sorted(ordering, reverse=True)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "after_pub=bad&after_id=1",
+        "after_pub=2020-13-45T00:00:00&after_id=1",
+        "after_pub=2020-01-01T00:00:00%2B00:00&after_id=x",
+        "after_pub=2020-01-01T00:00:00%2B00:00"
+        "&after_id=99999999999999999999999",
+        "after_id=1",
+        "after_pub=2020-01-01T00:00:00%2B00:00&after_id=%C2%B2",
+        "after_pub=0001-01-01T00:00:00%2B05:00&after_id=1",
+        "after_pub=9999-12-31T23:59:59-05:00&after_id=1",
+    ],
+)
+def test_bad_cursor_shows_first_page(
+    client, posts_with_shared_pub_date, query
+):
+    first_page = [post.id for post in client.get("/").context["page_obj"]]
+    response = client.get(f"/?{query}")
+    assert response.status_code == HTTPStatus.OK
+    page_obj = response.context["page_obj"]
+    assert [post.id for post in page_obj] == first_page
+    assert not page_obj.has_previous()
+
+
+def test_naive_cursor_date_is_accepted(client, posts_with_shared_pub_date):
+    page_obj = client.get("/").context["page_obj"]
+    after_pub, after_id = page_obj.next_cursor
+    naive_pub = timezone.make_naive(
+        datetime.fromisoformat(after_pub), timezone.utc
+    ).isoformat()
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        response = client.get(f"/?after_pub={naive_pub}&after_id={after_id}")
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.context["page_obj"]) == N_PER_PAGE
+    assert not [
+        w for w in caught if "naive datetime" in str(w.message)
+    ], (
+        "Убедитесь, что дата из курсора без часового пояса "
+        "приводится к текущему часовому поясу."
+    )
+
+
+@pytest.mark.parametrize("with_cursor", [False, True])
+def test_feed_page_is_a_single_query(
+    client, posts_with_shared_pub_date, django_assert_num_queries,
+    with_cursor
+):
+    url = "/"
+    if with_cursor:
+        page_obj = client.get(url).context["page_obj"]
+        url = f"/?{page_obj.next_page_query}"
+    with django_assert_num_queries(1) as captured:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert "LIMIT 11" in captured.captured_queries[0]["sql"], (
+        "Убедитесь, что лента выбирает из базы только одну страницу"
+        " публикаций."
+    )